@@ -0,0 +1,278 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Builds the native Qrack library and the Catalyst ``qrack_device`` runtime
+library. This is the only build recipe: ``setup.py`` imports it, and the
+``build-deps`` target of the Makefile runs it as a script. It is not part of
+the installed package.
+
+The sources the build depends on are fingerprinted, and the fingerprint is
+stored in ``build/.deps.stamp``; when it is unchanged, :func:`build` returns
+without invoking CMake. Set ``PENNYLANE_QRACK_FORCE_BUILD=1`` to rebuild
+regardless.
+"""
+
+import hashlib
+import os
+import platform
+import shutil
+import subprocess
+import sys
+
+QRACK_REPO = "https://github.com/unitaryfund/qrack.git"
+QRACK_COMMIT = "f9f64760a60cbc14cdbee049570dceeca3c8e9bf"
+
+STAMP_FILE = os.path.join("build", ".deps.stamp")
+
+# Files and directories whose contents determine the build outputs
+_SOURCES = [
+    "Makefile",
+    "CMakeLists.txt",
+    os.path.join("pennylane_qrack", "qrack_device.cpp"),
+    os.path.join("catalyst", "runtime", "include"),
+    os.path.join("qrack", "CMakeLists.txt"),
+    os.path.join("qrack", "include"),
+    os.path.join("qrack", "src"),
+]
+
+# Qrack configuration shared by every platform
+_QRACK_FLAGS = ["-DCPP_STD=20", "-DQBCAPPOW=8"]
+# Options for processors without the x86 SIMD extensions Qrack uses by default
+_NON_X86_FLAGS = ["-DENABLE_COMPLEX_X2=OFF", "-DENABLE_SSE3=OFF"]
+
+
+def _cmake():
+    for path in ("/usr/local/bin/cmake", "/usr/bin/cmake"):
+        if os.path.exists(path):
+            return path
+    return "cmake"
+
+
+def _is_x86():
+    return platform.machine().lower() in ("x86_64", "amd64", "i386", "i686")
+
+
+def library_name():
+    """File name of the Catalyst runtime library on this platform"""
+    return "libqrack_device.dylib" if sys.platform == "darwin" else "libqrack_device.so"
+
+
+def build_jobs():
+    """Number of parallel compile jobs, from ``PENNYLANE_QRACK_BUILD_JOBS`` or the CPU count"""
+    jobs = os.environ.get("PENNYLANE_QRACK_BUILD_JOBS")
+    if jobs:
+        return max(int(jobs), 1)
+    return os.cpu_count() or 1
+
+
+def build_env():
+    """Environment for the build commands.
+
+    If ``ccache`` (or else ``sccache``) is installed, it is set as the C and C++
+    compiler launcher of newly configured CMake build trees, so that unchanged
+    translation units are not recompiled. Launchers already set in the
+    environment are kept.
+    """
+    env = dict(os.environ)
+    launcher = shutil.which("ccache") or shutil.which("sccache")
+    if launcher is not None:
+        for lang in ("C", "CXX"):
+            env.setdefault(f"CMAKE_{lang}_COMPILER_LAUNCHER", launcher)
+    return env
+
+
+def _cmake_build(cmake, *target):
+    return [cmake, "--build", ".", "--parallel", str(build_jobs())] + list(target)
+
+
+def _run(command, cwd=None):
+    print(" ".join(command), flush=True)
+    subprocess.run(command, cwd=cwd, env=build_env(), check=True)
+
+
+def fingerprint(qrack=None):
+    """Hash the paths, modification times and sizes of the build sources.
+
+    The directory of the Qrack library being linked is included, so that switching
+    between the vendored and a system Qrack triggers a rebuild. When building against
+    a system Qrack, its version and the modification times and sizes of its libraries
+    are included too, so that upgrading it triggers a rebuild.
+
+    Args:
+        qrack (tuple[str, str, str]): library and include directories and version of the
+            system Qrack being built against, if any
+
+    Returns:
+        str: hex digest identifying the current state of the sources
+    """
+    entries = []
+    for source in _SOURCES:
+        if os.path.isfile(source):
+            paths = [source]
+        else:
+            paths = [
+                os.path.join(root, name) for root, _, names in os.walk(source) for name in names
+            ]
+        for path in paths:
+            stat = os.stat(path)
+            entries.append((path, stat.st_mtime_ns, stat.st_size))
+    if qrack is not None and os.path.isdir(qrack[0]):
+        for name in os.listdir(qrack[0]):
+            if name.startswith("libqrack"):
+                path = os.path.join(qrack[0], name)
+                stat = os.stat(path)
+                entries.append((path, stat.st_mtime_ns, stat.st_size))
+
+    lib_dir = os.path.abspath(os.path.join("qrack", "build") if qrack is None else qrack[0])
+    digest = hashlib.sha1(repr((lib_dir, qrack)).encode())
+    for entry in sorted(entries):
+        digest.update(repr(entry).encode())
+    return digest.hexdigest()
+
+
+def is_up_to_date(stamp=None):
+    """Whether the runtime library was built from the current sources.
+
+    Args:
+        stamp (str): fingerprint of the sources, computed if not given
+
+    Returns:
+        bool: True if the library exists and the recorded fingerprint matches
+    """
+    if not os.path.exists(os.path.join("pennylane_qrack", library_name())):
+        return False
+    try:
+        with open(STAMP_FILE) as f:
+            recorded = f.read().strip()
+    except OSError:
+        return False
+    return recorded == (stamp if stamp is not None else fingerprint())
+
+
+def write_stamp(stamp=None):
+    """Record the fingerprint of the sources the runtime library was built from.
+
+    Args:
+        stamp (str): fingerprint to record, computed if not given
+    """
+    os.makedirs(os.path.dirname(STAMP_FILE), exist_ok=True)
+    with open(STAMP_FILE, "w") as f:
+        f.write(stamp if stamp is not None else fingerprint())
+
+
+def _build_qrack():
+    cmake = _cmake()
+    build_dir = os.path.join("qrack", "build")
+    os.makedirs(build_dir, exist_ok=True)
+
+    flags = list(_QRACK_FLAGS)
+    if sys.platform == "darwin":
+        flags += ["-DCMAKE_POSITION_INDEPENDENT_CODE=ON", "-DENABLE_OPENCL=OFF"]
+        if not _is_x86():
+            flags += ["-DENABLE_RDRAND=OFF"] + _NON_X86_FLAGS
+        _run([cmake] + flags + [".."], cwd=build_dir)
+        _run(_cmake_build(cmake), cwd=build_dir)
+        # The runtime library links against the installed Qrack on macOS
+        _run(["sudo", cmake, "--install", "."], cwd=build_dir)
+    else:
+        flags += ["-DENABLE_RDRAND=OFF", "-DENABLE_DEVRAND=ON"]
+        if not _is_x86():
+            flags += _NON_X86_FLAGS
+        _run([cmake] + flags + [".."], cwd=build_dir)
+        _run(_cmake_build(cmake, "--target", "qrack"), cwd=build_dir)
+
+
+def system_qrack():
+    """Find the Qrack installation registered with ``pkg-config``, if one is to be used.
+
+    A system Qrack is only used when ``PENNYLANE_QRACK_SYSTEM_QRACK=1`` is set;
+    otherwise the pinned Qrack commit is always built.
+
+    Returns:
+        tuple[str, str, str] or None: the library and include directories and the
+        version of the installed Qrack, or None if it is not to be used or
+        ``pkg-config`` does not know of one
+    """
+    if os.environ.get("PENNYLANE_QRACK_SYSTEM_QRACK") != "1":
+        return None
+    if shutil.which("pkg-config") is None:
+        return None
+    if subprocess.run(["pkg-config", "--exists", "qrack"]).returncode != 0:
+        return None
+
+    def query(option):
+        return subprocess.run(
+            ["pkg-config", option, "qrack"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+
+    return query("--variable=libdir"), query("--variable=includedir"), query("--modversion")
+
+
+def _build_device(qrack=None):
+    cmake = _cmake()
+    if qrack is None:
+        include_dir = os.path.join("_qrack_include", "qrack")
+        shutil.copytree(os.path.join("qrack", "include"), include_dir, dirs_exist_ok=True)
+        shutil.copytree(os.path.join("qrack", "build", "include"), include_dir, dirs_exist_ok=True)
+        # Use the default locations, even if an earlier configuration used a system Qrack
+        qrack_flags = ["-UQRACK_DIR", "-UQRACK_INCLUDE_DIR"]
+    else:
+        lib_dir, include_dir, _ = qrack
+        qrack_flags = [f"-DQRACK_DIR={lib_dir}", f"-DQRACK_INCLUDE_DIR={include_dir}"]
+    # find_library() caches QRACK_LIB, so look the library up again in QRACK_DIR
+    qrack_flags.append("-UQRACK_LIB")
+
+    os.makedirs("_build", exist_ok=True)
+    _run([cmake] + qrack_flags + [".."], cwd="_build")
+    _run(_cmake_build(cmake), cwd="_build")
+    shutil.copy(os.path.join("_build", library_name()), "pennylane_qrack")
+
+
+def build(force=False):
+    """Build Qrack and the ``qrack_device`` runtime library, unless they are up to date.
+
+    If ``PENNYLANE_QRACK_SYSTEM_QRACK=1`` and ``pkg-config`` finds an installed
+    Qrack, the runtime library is built against it, and Qrack itself is neither
+    cloned nor built. Otherwise Qrack is cloned at the pinned commit if there is
+    no ``qrack`` checkout in the working directory. Nothing is built on platforms other than Linux and macOS.
+
+    Args:
+        force (bool): rebuild even if the sources have not changed since the last build
+
+    Raises:
+        subprocess.CalledProcessError: if a build command fails
+    """
+    if sys.platform not in ("linux", "darwin"):
+        return
+
+    qrack = system_qrack()
+    if qrack is None and not os.path.isdir("qrack"):
+        _run(["git", "clone", QRACK_REPO])
+        _run(["git", "checkout", QRACK_COMMIT], cwd="qrack")
+
+    stamp = fingerprint(qrack)
+    if not force and is_up_to_date(stamp):
+        return
+
+    if qrack is None:
+        _build_qrack()
+    _build_device(qrack)
+    write_stamp(stamp)
+
+
+if __name__ == "__main__":
+    build(force=os.environ.get("PENNYLANE_QRACK_FORCE_BUILD") == "1")
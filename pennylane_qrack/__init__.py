@@ -13,4 +13,6 @@
 # limitations under the License.
 
 """PennyLane-Qrack plugin (no public API)"""
+# The devices are loaded through their own modules' entry points; importing the
+# package must not pull in pyqrack and the native Qrack library
 from ._version import __version__
@@ -0,0 +1,374 @@
+# Copyright 2020 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Helpers shared by the PennyLane-Qrack devices.
+
+The gate helpers return a binder, which takes the pyqrack simulator ``state``
+and returns a handler ``handler(labels, par)`` with the simulator methods
+already resolved. ``labels`` are the device wire labels (controls first,
+target last) and ``par`` are the operation parameters.
+"""
+
+import os
+import weakref
+
+import numpy as np
+
+# PennyLane v0.42 introduced the `exceptions` module and will raise
+# deprecation warnings if they are imported from the top-level module.
+
+# This ensures backwards compatibility with older versions of PennyLane.
+try:
+    from pennylane.exceptions import DeviceError
+except (ModuleNotFoundError, ImportError) as import_error:
+    from pennylane import DeviceError
+
+from pennylane.ops import Adjoint, BasisState
+
+# Floating-point precision of the Qrack build, as log2 of the bits per real number
+# (5 is single and 6 is double precision; Qrack fixes this when it is compiled)
+QRACK_FPPOW = int(os.environ.get("QRACK_FPPOW", "5"))
+
+# single-wire rotations that can be merged by adding their angles
+_FUSIBLE_ROTATIONS = frozenset(["RX", "RY", "RZ"])
+
+
+def self_inverse(binder):
+    """Use the same binder for an operation and its adjoint."""
+    return (binder, binder)
+
+
+def _noop(labels, par):
+    pass
+
+
+def identity(state):
+    """No-op handler for identity gates."""
+    return _noop
+
+
+def each(method):
+    """Apply a parameterless single-qubit method to every wire."""
+
+    def binder(state):
+        fn = getattr(state, method)
+
+        def apply(labels, par):
+            for label in labels:
+                fn(label)
+
+        return apply
+
+    return binder
+
+
+def controlled(method):
+    """Apply a multi-controlled method, with the last wire as target."""
+
+    def binder(state):
+        fn = getattr(state, method)
+
+        def apply(labels, par):
+            fn(labels[:-1], labels[-1])
+
+        return apply
+
+    return binder
+
+
+def two_qubit(method):
+    """Apply a two-qubit method to the first two wires."""
+
+    def binder(state):
+        fn = getattr(state, method)
+
+        def apply(labels, par):
+            fn(labels[0], labels[1])
+
+        return apply
+
+    return binder
+
+
+def rotation(pauli, inverse=False):
+    """Apply a Pauli rotation by ``par[0]`` (negated if ``inverse``) to every wire."""
+
+    def binder(state):
+        r = state.r
+
+        def apply(labels, par):
+            theta = -par[0] if inverse else par[0]
+            for label in labels:
+                r(pauli, theta, label)
+
+        return apply
+
+    return binder
+
+
+def u(angles):
+    """Apply a general ``u`` gate to every wire, with ``angles(par)`` giving (theta, phi, lambda)."""
+
+    def binder(state):
+        fn = state.u
+
+        def apply(labels, par):
+            theta, phi, lam = angles(par)
+            for label in labels:
+                fn(label, theta, phi, lam)
+
+        return apply
+
+    return binder
+
+
+def rotations(axes):
+    """Apply a sequence of Pauli rotations to every wire.
+
+    ``axes`` is a sequence of ``(pauli, index, sign)`` triples, applied in order,
+    each rotating by ``sign * par[index]``.
+    """
+
+    def binder(state):
+        r = state.r
+
+        def apply(labels, par):
+            for label in labels:
+                for pauli, index, sign in axes:
+                    r(pauli, sign * par[index], label)
+
+        return apply
+
+    return binder
+
+
+def fuse_rotations(ops):
+    """Merge runs of same-axis rotations on the same wire into single rotations.
+
+    A rotation is merged into the previous rotation on its wire if that rotation
+    has the same axis and no other operation acted on the wire in between.
+    Adjoint rotations are merged with their angle negated.
+
+    Args:
+        ops (List[pennylane.Operation]): operations to fuse
+
+    Returns:
+        List[pennylane.Operation]: the fused operations, in order
+    """
+    # entries are [op, rotation base, accumulated angle, merged]
+    fused = []
+    # wire -> entry of the rotation still open on that wire
+    pending = {}
+    for op in ops:
+        base, sign = (op.base, -1) if isinstance(op, Adjoint) else (op, 1)
+        if base.name in _FUSIBLE_ROTATIONS:
+            wire = base.wires[0]
+            entry = pending.get(wire)
+            if entry is not None and entry[1].name == base.name:
+                entry[2] = entry[2] + sign * base.parameters[0]
+                entry[3] = True
+                continue
+            entry = [op, base, sign * base.parameters[0], False]
+            pending[wire] = entry
+            fused.append(entry)
+            continue
+        for wire in op.wires:
+            pending.pop(wire, None)
+        fused.append([op, None, None, False])
+
+    return [
+        type(base)(angle, wires=base.wires) if merged else op for op, base, angle, merged in fused
+    ]
+
+
+def reset_all(state):
+    """Return every qubit of ``state`` to |0>.
+
+    Uses the simulator's native ``reset_all()`` when it has one, and otherwise
+    measures each qubit and flips those that collapsed to |1>.
+    """
+    native = getattr(state, "reset_all", None)
+    if native is not None:
+        native()
+        return
+    for i in range(state.num_qubits()):
+        if state.m(i):
+            state.x(i)
+
+
+def set_basis_state(state, labels, bits, num_qubits):
+    """Set the given qubits of ``state`` to a computational basis state.
+
+    Args:
+        state: pyqrack simulator to prepare
+        labels (Sequence[int]): device wire labels of the qubits to set
+        bits (Sequence[int]): value of each qubit, in the order of ``labels``
+        num_qubits (int): number of qubits of ``state``
+    """
+    if len(labels) == num_qubits:
+        # The basis state fixes every qubit, so start from |0...0> instead of measuring
+        reset_all(state)
+        for index, bit in zip(labels, bits):
+            if bit:
+                state.x(index)
+        return
+
+    for index, bit in zip(labels, bits):
+        if bit != state.m(index):
+            state.x(index)
+
+
+def sample_buffer(shots, num_wires):
+    """Return an empty array to collect ``shots`` results of ``m_all()`` in.
+
+    The results only fit in ``uint64`` for up to 64 wires, so wider devices get an
+    object array of Python integers.
+    """
+    return np.empty(shots, dtype=np.uint64 if num_wires <= 64 else object)
+
+
+def samples_to_binary(samples, num_wires):
+    """Convert measurement results to rows of bits, in wire order.
+
+    Args:
+        samples (Sequence[int]): results holding wire ``i`` in bit ``i``, as from ``m_all()``
+        num_wires (int): number of wires measured
+
+    Returns:
+        array[int8]: one row of ``num_wires`` bits per result
+    """
+    # QubitDevice.states_to_binary() doesn't work for >64qb, so unpack the little-endian bytes
+    if num_wires <= 64:
+        raw = np.asarray(samples, dtype="<u8").view(np.uint8).reshape(-1, 8)
+    else:
+        n_bytes = (num_wires + 7) >> 3
+        raw = np.frombuffer(
+            b"".join(int(b).to_bytes(n_bytes, "little") for b in samples), dtype=np.uint8
+        ).reshape(-1, n_bytes)
+    return np.unpackbits(raw, axis=1, count=num_wires, bitorder="little").astype(np.int8)
+
+
+def observable_entry(cache, observable_map, observable):
+    """Return the cached ``[ref, bases, eigvals]`` entry of an observable.
+
+    Entries are keyed by identity, with a weak reference guarding against ``id`` reuse,
+    and are dropped when the observable is garbage collected. ``eigvals`` is filled on
+    first use.
+
+    Args:
+        cache (dict): the device's observable cache
+        observable_map (dict): the device's map from observable name to Pauli basis
+        observable (pennylane.operation.Operator): observable to look up
+
+    Returns:
+        list: the cache entry of the observable
+    """
+    key = id(observable)
+    entry = cache.get(key)
+    if entry is not None and entry[0]() is observable:
+        return entry
+
+    if isinstance(observable.name, list):
+        b = [observable_map[obs] for obs in observable.name]
+    elif observable.name == "Prod":
+        b = [observable_map[obs.name] for obs in observable.operands]
+    else:
+        b = [observable_map[observable.name]]
+
+    ref = weakref.ref(observable, lambda _: cache.pop(key, None))
+    entry = cache[key] = [ref, b, None]
+    return entry
+
+
+class GateReplayMixin:
+    """Resolves operations to bound native handler calls, for devices that replay circuits.
+
+    The device class sets ``_gate_dispatch`` to its map from operation name to the
+    (operation, adjoint) binders and provides ``_apply_basis_state``, and each
+    instance calls ``_init_replay()`` once its simulator exists. Rotations are fused
+    unless the device is noisy, since noise is applied per gate.
+    """
+
+    _gate_dispatch = {}
+
+    def _init_replay(self):
+        """Set up an empty circuit and the caches used to replay it"""
+        # Operations applied since the last reset, replayed to rebuild the state
+        self._circuit = []
+        # Resolved calls replaying `_circuit`, rebuilt whenever it changes
+        self._replay = None
+        # Gate handlers bound to this device's simulator on first use,
+        # indexed by whether the operation is an adjoint and then by name
+        # (or by class, for operations named after their class)
+        self._gates = ({}, {})
+        # Device wire labels per operation wires; the wire map is fixed at construction
+        self._wire_cache = {}
+
+    def _apply(self):
+        if self._replay is None:
+            self._replay = self._compile(self._circuit)
+        for apply, args in self._replay:
+            apply(*args)
+
+    def _compile(self, operations):
+        """Resolve operations to the list of (handler, args) calls that apply them"""
+        if not getattr(self, "noise", 0):
+            operations = fuse_rotations(operations)
+        replay = []
+        for op in operations:
+            if isinstance(op, BasisState):
+                replay.append((self._apply_basis_state, (op,)))
+            else:
+                replay.append(self._resolve_gate(op))
+        return replay
+
+    def _resolve_gate(self, op):
+        """Return the bound native qrack handler of an operation and its arguments"""
+
+        is_inv = isinstance(op, Adjoint)
+        if is_inv:
+            op = op.base
+
+        gates = self._gates[is_inv]
+        op_type = type(op)
+        apply = gates.get(op_type)
+        if apply is None:
+            opname = op.name
+            apply = gates.get(opname)
+            if apply is None:
+                binder = self._gate_dispatch.get(opname, (None, None))[is_inv]
+                if binder is None:
+                    if is_inv:
+                        opname += ".inv"
+                    raise DeviceError(
+                        f"Operation {opname} is not supported on a {self.short_name} device."
+                    )
+                apply = gates[opname] = binder(self._state)
+            if opname == op_type.__name__:
+                # The class fixes the name, so later lookups can go by type alone
+                gates[op_type] = apply
+
+        return apply, (self._resolve_wires(op), op.parameters)
+
+    def _resolve_wires(self, op):
+        """Return the device wire labels of an operation, controls first"""
+        key = (op.wires, op.control_wires)
+        labels = self._wire_cache.get(key)
+        if labels is None:
+            # translate op wire labels to consecutive wire labels used by the device
+            device_wires = self.map_wires(
+                (op.control_wires + op.wires) if op.control_wires else op.wires
+            )
+            labels = self._wire_cache[key] = device_wires.labels
+        return labels
@@ -14,12 +14,9 @@
 """
 Base device class for PennyLane-Qrack.
 """
-from functools import reduce
-import cmath, math
+import math
+import importlib.resources
 import os
-import pathlib
-import sys
-import itertools as it
 
 import numpy as np
 
@@ -33,22 +30,75 @@ except (ModuleNotFoundError, ImportError) as import_error:
     from pennylane import DeviceError, QuantumFunctionError
 
 from pennylane.devices import QubitDevice
-from pennylane.ops import (
-    BasisState,
-    Adjoint,
-)
 from pennylane.wires import Wires
 
 from pyqrack import QrackAceBackend, Pauli
 
+from . import _dispatch
 from ._version import __version__
 from sys import platform as _platform
 
 # tolerance for numerical errors
 tolerance = 1e-10
 
-
-class QrackAceDevice(QubitDevice):
+# Euler angles for SX and its inverse
+_HALF_PI = math.pi / 2
+_NEG_HALF_PI = -_HALF_PI
+
+# Map from operation name to the native qrack handler binders for the
+# operation and its adjoint (None if the adjoint is not supported)
+_GATE_DISPATCH = {
+    "Identity": _dispatch.self_inverse(_dispatch.identity),
+    "C(Identity)": _dispatch.self_inverse(_dispatch.identity),
+    "MultiRZ": (_dispatch.rotation(Pauli.PauliZ), None),
+    "CNOT": _dispatch.self_inverse(_dispatch.controlled("mcx")),
+    "C(PauliX)": _dispatch.self_inverse(_dispatch.controlled("mcx")),
+    "C(PauliY)": _dispatch.self_inverse(_dispatch.controlled("mcy")),
+    "C(PauliZ)": _dispatch.self_inverse(_dispatch.controlled("mcz")),
+    "SWAP": _dispatch.self_inverse(_dispatch.two_qubit("swap")),
+    "ISWAP": (_dispatch.two_qubit("iswap"), _dispatch.two_qubit("adjiswap")),
+    "CY": _dispatch.self_inverse(_dispatch.controlled("mcy")),
+    "C(CY)": _dispatch.self_inverse(_dispatch.controlled("mcy")),
+    "CZ": _dispatch.self_inverse(_dispatch.controlled("mcz")),
+    "C(CZ)": _dispatch.self_inverse(_dispatch.controlled("mcz")),
+    "S": (_dispatch.each("s"), _dispatch.each("adjs")),
+    "T": (_dispatch.each("t"), _dispatch.each("adjt")),
+    "RX": (
+        _dispatch.rotation(Pauli.PauliX),
+        _dispatch.rotation(Pauli.PauliX, inverse=True),
+    ),
+    "RY": (
+        _dispatch.rotation(Pauli.PauliY),
+        _dispatch.rotation(Pauli.PauliY, inverse=True),
+    ),
+    "RZ": (
+        _dispatch.rotation(Pauli.PauliZ),
+        _dispatch.rotation(Pauli.PauliZ, inverse=True),
+    ),
+    "PauliX": _dispatch.self_inverse(_dispatch.each("x")),
+    "PauliY": _dispatch.self_inverse(_dispatch.each("y")),
+    "PauliZ": _dispatch.self_inverse(_dispatch.each("z")),
+    "Hadamard": _dispatch.self_inverse(_dispatch.each("h")),
+    "SX": (
+        _dispatch.u(lambda par: (_HALF_PI, _NEG_HALF_PI, _HALF_PI)),
+        _dispatch.u(lambda par: (_NEG_HALF_PI, _NEG_HALF_PI, _HALF_PI)),
+    ),
+    "PhaseShift": (
+        _dispatch.u(lambda par: (0, par[0] / 2, par[0] / 2)),
+        _dispatch.u(lambda par: (0, -par[0] / 2, -par[0] / 2)),
+    ),
+    "U3": (
+        _dispatch.u(lambda par: (par[0], par[1], par[2])),
+        _dispatch.u(lambda par: (-par[0], -par[2], -par[1])),
+    ),
+    "Rot": (
+        _dispatch.rotations(((Pauli.PauliZ, 0, 1), (Pauli.PauliY, 1, 1), (Pauli.PauliZ, 2, 1))),
+        _dispatch.rotations(((Pauli.PauliZ, 2, -1), (Pauli.PauliY, 1, -1), (Pauli.PauliZ, 0, -1))),
+    ),
+}
+
+
+class QrackAceDevice(_dispatch.GateReplayMixin, QubitDevice):
     """Qrack Ace device"""
 
     name = "Qrack Ace device"
@@ -109,9 +159,8 @@ class QrackAceDevice(QubitDevice):
         "Rot",
     }
 
-    config_filepath = pathlib.Path(
-        os.path.dirname(sys.modules[__name__].__file__) + "/QrackAceDeviceConfig.toml"
-    )
+    config_filepath = importlib.resources.files(__package__) / "QrackAceDeviceConfig.toml"
+    _gate_dispatch = _GATE_DISPATCH
 
     # Use "hybrid" stabilizer optimization? (Default is "true"; non-Clifford circuits will fall back to near-Clifford or universal simulation)
     is_stabilizer_hybrid = True
@@ -137,6 +186,9 @@ class QrackAceDevice(QubitDevice):
     history_window=0
     # Whether boundary row at end is explicitly inserted to create a torus
     is_torus=True
+    # Floating-point precision, as log2 of the bits per real number
+    # (must match the Qrack build, set by "QRACK_FPPOW")
+    fp_pow = _dispatch.QRACK_FPPOW
 
     def __init__(self, wires=0, shots=None, **kwargs):
         options = dict(kwargs)
@@ -166,6 +218,14 @@ class QrackAceDevice(QubitDevice):
             self.history_window = options["history_window"]
         if "is_torus" in options:
             self.is_torus = options["is_torus"]
+        if "fp_pow" in options:
+            self.fp_pow = int(options["fp_pow"])
+            if self.fp_pow != _dispatch.QRACK_FPPOW:
+                raise ValueError(
+                    f"fp_pow={self.fp_pow} does not match the Qrack build "
+                    f"(QRACK_FPPOW={_dispatch.QRACK_FPPOW}). Qrack precision is fixed at "
+                    "compile time; set QRACK_FPPOW to match a build of that precision."
+                )
 
         super().__init__(wires=wires, shots=shots)
         self.shots = shots
@@ -197,14 +257,12 @@ class QrackAceDevice(QubitDevice):
             "noise": self.noise,
             "history_window": self.history_window,
             "is_torus": self.is_torus,
+            "fp_pow": self.fp_pow,
         }
-        self._circuit = []
-
-    def _reverse_state(self):
-        end = self.num_wires - 1
-        mid = self.num_wires >> 1
-        for i in range(mid):
-            self._state.swap(i, end - i)
+        # Noisy circuits are buffered in `_circuit` and replayed from |0...0> for every
+        # shot; noiseless ones are applied to the simulator as soon as they arrive
+        self._needs_replay = bool(self.noise)
+        self._init_replay()
 
     def apply(self, operations, **kwargs):
         """Apply the circuit operations to the state.
@@ -215,18 +273,14 @@ class QrackAceDevice(QubitDevice):
             operations (List[pennylane.Operation]): operations to be applied
         """
 
-        self._circuit = self._circuit + operations
-        if self.noise == 0:
-            self._apply()
-            self._circuit = []
-        # else: Defer application until shots or expectation values are requested
+        if not self._needs_replay:
+            for apply, args in self._compile(operations):
+                apply(*args)
+            return
 
-    def _apply(self):
-        for op in self._circuit:
-            if isinstance(op, BasisState):
-                self._apply_basis_state(op)
-            else:
-                self._apply_gate(op)
+        # Defer application until shots or expectation values are requested
+        self._circuit = self._circuit + operations
+        self._replay = None
 
     def _apply_basis_state(self, op):
         """Initialize a basis state"""
@@ -240,138 +294,7 @@ class QrackAceDevice(QubitDevice):
         if n_basis_state != wire_count:
             raise ValueError("BasisState parameter and wires must be of equal length.")
 
-        for i in range(wire_count):
-            index = wires.labels[i]
-            if par[i] != self._state.m(index):
-                self._state.x(index)
-
-    def _apply_gate(self, op):
-        """Apply native qrack gate"""
-
-        opname = op.name
-        if isinstance(op, Adjoint):
-            op = op.base
-            opname = op.name + ".inv"
-
-        par = op.parameters
-
-        if opname == "MultiRZ":
-            device_wires = self.map_wires(op.wires)
-            for q in device_wires:
-                self._state.r(Pauli.PauliZ, par[0], q)
-            return
-
-        # translate op wire labels to consecutive wire labels used by the device
-        device_wires = self.map_wires(
-            (op.control_wires + op.wires) if op.control_wires else op.wires
-        )
-
-        if opname in [
-            "".join(p)
-            for p in it.product(
-                [
-                    "CNOT",
-                    "C(PauliX)",
-                ],
-                ["", ".inv"],
-            )
-        ]:
-            self._state.mcx(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["C(PauliY)", "C(PauliY).inv"]:
-            self._state.mcy(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["C(PauliZ)", "C(PauliZ).inv"]:
-            self._state.mcz(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["SWAP", "SWAP.inv"]:
-            self._state.swap(device_wires.labels[0], device_wires.labels[1])
-        elif opname == "ISWAP":
-            self._state.iswap(device_wires.labels[0], device_wires.labels[1])
-        elif opname == "ISWAP.inv":
-            self._state.adjiswap(device_wires.labels[0], device_wires.labels[1])
-        elif opname in ["CY", "CY.inv", "C(CY)", "C(CY).inv"]:
-            self._state.mcy(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["CZ", "CZ.inv", "C(CZ)", "C(CZ).inv"]:
-            self._state.mcz(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname == "S":
-            for label in device_wires.labels:
-                self._state.s(label)
-        elif opname == "S.inv":
-            for label in device_wires.labels:
-                self._state.adjs(label)
-        elif opname == "T":
-            for label in device_wires.labels:
-                self._state.t(label)
-        elif opname == "T.inv":
-            for label in device_wires.labels:
-                self._state.adjt(label)
-        elif opname == "RX":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliX, par[0], label)
-        elif opname == "RX.inv":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliX, -par[0], label)
-        elif opname == "RY":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliY, par[0], label)
-        elif opname == "RY.inv":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliY, -par[0], label)
-        elif opname == "RZ":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliZ, par[0], label)
-        elif opname == "RZ.inv":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliZ, -par[0], label)
-        elif opname in ["PauliX", "PauliX.inv"]:
-            for label in device_wires.labels:
-                self._state.x(label)
-        elif opname in ["PauliY", "PauliY.inv"]:
-            for label in device_wires.labels:
-                self._state.y(label)
-        elif opname in ["PauliZ", "PauliZ.inv"]:
-            for label in device_wires.labels:
-                self._state.z(label)
-        elif opname in ["Hadamard", "Hadamard.inv"]:
-            for label in device_wires.labels:
-                self._state.h(label)
-        elif opname == "SX":
-            half_pi = math.pi / 2
-            for label in device_wires.labels:
-                self._state.u(label, half_pi, -half_pi, half.pi)
-        elif opname == "SX.inv":
-            half_pi = math.pi / 2
-            for label in device_wires.labels:
-                self._state.u(label, -half_pi, -half.pi, half_pi)
-        elif opname == "PhaseShift":
-            half_par = par[0] / 2
-            for label in device_wires.labels:
-                self._state.u(label, 0, half_par, half_par)
-        elif opname == "PhaseShift.inv":
-            half_par = par[0] / 2
-            for label in device_wires.labels:
-                self._state.u(label, 0, -half_par, -half_par)
-        elif opname == "U3":
-            for label in device_wires.labels:
-                self._state.u(label, par[0], par[1], par[2])
-        elif opname == "U3.inv":
-            for label in device_wires.labels:
-                self._state.u(label, -par[0], -par[2], -par[1])
-        elif opname == "Rot":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliZ, par[0], label)
-                self._state.r(Pauli.PauliY, par[1], label)
-                self._state.r(Pauli.PauliZ, par[2], label)
-        elif opname == "Rot.inv":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliZ, -par[2], label)
-                self._state.r(Pauli.PauliY, -par[1], label)
-                self._state.r(Pauli.PauliZ, -par[0], label)
-        elif opname not in [
-            "Identity",
-            "Identity.inv",
-            "C(Identity)",
-            "C(Identity).inv",
-        ]:
-            raise DeviceError(f"Operation {opname} is not supported on a {self.short_name} device.")
+        _dispatch.set_basis_state(self._state, wires.labels, par, self.num_wires)
 
     def analytic_probability(self, wires=None):
         raise DeviceError(
@@ -398,14 +321,6 @@ class QrackAceDevice(QubitDevice):
         # estimate the ev
         return np.mean(self.sample(observable))
 
-    def _generate_sample(self):
-        rev_sample = self._state.m_all()
-        sample = 0
-        for i in range(self.num_wires):
-            if (rev_sample & (1 << i)) > 0:
-                sample |= 1 << (self.num_wires - (i + 1))
-        return sample
-
     def generate_samples(self):
         if self.shots is None:
             raise QuantumFunctionError(
@@ -413,33 +328,30 @@ class QrackAceDevice(QubitDevice):
                 "when using sample-based measurements."
             )
 
-        if self.noise != 0:
-            samples = []
-            for _ in range(self.shots):
-                self._state.reset_all()
+        if self._needs_replay:
+            state = self._state
+            samples = _dispatch.sample_buffer(self.shots, self.num_wires)
+            for i in range(self.shots):
+                _dispatch.reset_all(state)
                 self._apply()
-                samples.append(self._generate_sample())
-            self._samples = QubitDevice.states_to_binary(np.array(samples), self.num_wires)
+                samples[i] = state.m_all()
+            self._samples = _dispatch.samples_to_binary(samples, self.num_wires)
             self._circuit = []
+            self._replay = None
 
             return self._samples
 
         if self.shots == 1:
-            self._samples = QubitDevice.states_to_binary(
-                np.array([self._generate_sample()]), self.num_wires
-            )
+            self._samples = _dispatch.samples_to_binary([self._state.m_all()], self.num_wires)
 
             return self._samples
 
-        # QubitDevice.states_to_binary() doesn't work for >64qb. (Fix by Elara, the custom OpenAI GPT)
-        samples = self._state.measure_shots(list(range(self.num_wires - 1, -1, -1)), self.shots)
-        self._samples = np.array(
-            [list(format(b, f"0{self.num_wires}b")) for b in samples], dtype=np.int8
-        )
+        samples = self._state.measure_shots(list(range(self.num_wires)), self.shots)
+        self._samples = _dispatch.samples_to_binary(samples, self.num_wires)
 
         return self._samples
 
     def reset(self):
-        for i in range(self.num_wires):
-            if self._state.m(i):
-                self._state.x(i)
+        _dispatch.reset_all(self._state)
+        self._circuit = []
+        self._replay = None
@@ -16,8 +16,8 @@ Base device class for PennyLane-Qrack.
 """
 from functools import reduce
 import cmath, math
+import importlib.resources
 import os
-import pathlib
 import sys
 import itertools as it
 
@@ -43,12 +43,23 @@ from pennylane.wires import Wires
 
 from pyqrack import QrackSimulator, Pauli
 
+from . import _dispatch
 from ._version import __version__
 from sys import platform as _platform
 
 # tolerance for numerical errors
 tolerance = 1e-10
 
+# Operations applied as a multi-controlled X gate (all are self-inverse)
+_MCX_OPS = frozenset(["Toffoli", "C(Toffoli)", "CNOT", "C(CNOT)", "MultiControlledX", "C(PauliX)"])
+
+# Pauli axes of the single-qubit rotation gates
+_ROTATION_AXES = {"RX": Pauli.PauliX, "RY": Pauli.PauliY, "RZ": Pauli.PauliZ}
+
+# SX and its inverse
+_SX_MTRX = [(1 + 1j) / 2, (1 - 1j) / 2, (1 - 1j) / 2, (1 + 1j) / 2]
+_ISX_MTRX = [(1 - 1j) / 2, (1 + 1j) / 2, (1 + 1j) / 2, (1 - 1j) / 2]
+
 
 class QrackDevice(QubitDevice):
     """Qrack device"""
@@ -146,9 +157,7 @@ class QrackDevice(QubitDevice):
         "C(MultiControlledX)",
     }
 
-    config_filepath = pathlib.Path(
-        os.path.dirname(sys.modules[__name__].__file__) + "/QrackDeviceConfig.toml"
-    )
+    config_filepath = importlib.resources.files(__package__) / "QrackDeviceConfig.toml"
 
     # Use "hybrid" stabilizer optimization? (Default is "true"; non-Clifford circuits will fall back to near-Clifford or universal simulation)
     is_stabilizer_hybrid = True
@@ -238,12 +247,13 @@ class QrackDevice(QubitDevice):
             "readout_noise_prob": self.readout_noise_prob,
         }
         self._circuit = []
+        # Pauli bases and eigenvalues of observables, by observable identity
+        self._observable_cache = {}
 
-    def _reverse_state(self):
-        end = self.num_wires - 1
-        mid = self.num_wires >> 1
-        for i in range(mid):
-            self._state.swap(i, end - i)
+    def _reverse_wire_order(self, state_vector):
+        """Map a state vector between qrack's qubit order and PennyLane's wire order"""
+        # qrack indexes qubit 0 as the least significant bit, PennyLane wire 0 as the most
+        return np.asarray(state_vector).reshape([2] * self.num_wires).transpose().reshape(-1)
 
     def apply(self, operations, **kwargs):
         """Apply the circuit operations to the state.
@@ -261,6 +271,7 @@ class QrackDevice(QubitDevice):
         # else: Defer application until shots or expectation values are requested
 
     def _apply(self):
+        apply_gate = self._apply_gate
         for op in self._circuit:
             if isinstance(op, StatePrep):
                 self._apply_state_prep(op)
@@ -273,7 +284,7 @@ class QrackDevice(QubitDevice):
                     )
                 self._apply_qubit_unitary(op)
             else:
-                self._apply_gate(op)
+                apply_gate(op)
 
     def _expand_state(self, state_vector, wires):
         """Expands state vector to more wires"""
@@ -304,13 +315,11 @@ class QrackDevice(QubitDevice):
         if not np.isclose(np.linalg.norm(input_state, 2), 1.0, atol=tolerance):
             raise ValueError("Sum of amplitudes-squared does not equal one.")
 
-        self._reverse_state()
         if len(wires) != self.num_wires or sorted(wires, reverse=True) != wires:
             input_state = self._expand_state(input_state, wires)
 
         # call qrack' state initialization
-        self._state.in_ket(input_state)
-        self._reverse_state()
+        self._state.in_ket(self._reverse_wire_order(input_state))
 
     def _apply_basis_state(self, op):
         """Initialize a basis state"""
@@ -324,32 +333,30 @@ class QrackDevice(QubitDevice):
         if n_basis_state != wire_count:
             raise ValueError("BasisState parameter and wires must be of equal length.")
 
-        for i in range(wire_count):
-            index = wires.labels[i]
-            if par[i] != self._state.m(index):
-                self._state.x(index)
+        _dispatch.set_basis_state(self._state, wires.labels, par, self.num_wires)
 
     def _apply_gate(self, op):
         """Apply native qrack gate"""
+        state = self._state
 
-        opname = op.name
-        if isinstance(op, Adjoint):
+        is_inv = isinstance(op, Adjoint)
+        if is_inv:
             op = op.base
-            opname = op.name + ".inv"
+        opname = op.name
 
         par = op.parameters
 
-        if opname == "MultiRZ":
+        if opname == "MultiRZ" and not is_inv:
             device_wires = self.map_wires(op.wires)
             for q in device_wires:
-                self._state.r(Pauli.PauliZ, par[0], q)
+                state.r(Pauli.PauliZ, par[0], q)
             return
 
-        if opname == "C(MultiRZ)":
+        if opname == "C(MultiRZ)" and not is_inv:
             device_wires = self.map_wires(op.wires)
             control_wires = self.map_wires(op.control_wires)
             for q in device_wires:
-                self._state.mcr(Pauli.PauliZ, par[0], control_wires, q)
+                state.mcr(Pauli.PauliZ, par[0], control_wires, q)
             return
 
         # translate op wire labels to consecutive wire labels used by the device
@@ -357,70 +364,46 @@ class QrackDevice(QubitDevice):
             (op.control_wires + op.wires) if op.control_wires else op.wires
         )
 
-        if opname in [
-            "".join(p)
-            for p in it.product(
-                [
-                    "Toffoli",
-                    "C(Toffoli)",
-                    "CNOT",
-                    "C(CNOT)",
-                    "MultiControlledX",
-                    "C(PauliX)",
-                ],
-                ["", ".inv"],
-            )
-        ]:
-            self._state.mcx(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["C(PauliY)", "C(PauliY).inv"]:
-            self._state.mcy(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["C(PauliZ)", "C(PauliZ).inv"]:
-            self._state.mcz(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["C(Hadamard)", "C(Hadamard).inv"]:
-            self._state.mch(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in [
-            "CSWAP",
-            "CSWAP.inv",
-            "C(SWAP)",
-            "C(SWAP).inv",
-            "C(CSWAP)",
-            "C(CSWAP).inv",
-        ]:
-            self._state.cswap(
+        if opname in _MCX_OPS:
+            state.mcx(device_wires.labels[:-1], device_wires.labels[-1])
+        elif opname == "C(PauliY)":
+            state.mcy(device_wires.labels[:-1], device_wires.labels[-1])
+        elif opname == "C(PauliZ)":
+            state.mcz(device_wires.labels[:-1], device_wires.labels[-1])
+        elif opname == "C(Hadamard)":
+            state.mch(device_wires.labels[:-1], device_wires.labels[-1])
+        elif opname in ["CSWAP", "C(SWAP)", "C(CSWAP)"]:
+            state.cswap(
                 device_wires.labels[:-2],
                 device_wires.labels[-2],
                 device_wires.labels[-1],
             )
         elif opname in ["CRX", "C(RX)", "C(CRX)"]:
-            self._state.mcr(Pauli.PauliX, par[0], device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["CRX.inv", "C(RX).inv", "C(CRX).inv"]:
-            self._state.mcr(
-                Pauli.PauliX, -par[0], device_wires.labels[:-1], device_wires.labels[-1]
+            state.mcr(
+                Pauli.PauliX,
+                -par[0] if is_inv else par[0],
+                device_wires.labels[:-1],
+                device_wires.labels[-1],
             )
         elif opname in ["CRY", "C(RY)", "C(CRY)"]:
-            self._state.mcr(Pauli.PauliY, par[0], device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["CRY.inv", "C(RY).inv", "C(CRY).inv"]:
-            self._state.mcr(
-                Pauli.PauliY, -par[0], device_wires.labels[:-1], device_wires.labels[-1]
+            state.mcr(
+                Pauli.PauliY,
+                -par[0] if is_inv else par[0],
+                device_wires.labels[:-1],
+                device_wires.labels[-1],
             )
         elif opname in ["CRZ", "C(RZ)", "C(CRZ)"]:
-            self._state.mcr(Pauli.PauliZ, par[0], device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["CRZ.inv", "C(RZ).inv", "C(CRZ).inv"]:
-            self._state.mcr(
-                Pauli.PauliZ, -par[0], device_wires.labels[:-1], device_wires.labels[-1]
+            state.mcr(
+                Pauli.PauliZ,
+                -par[0] if is_inv else par[0],
+                device_wires.labels[:-1],
+                device_wires.labels[-1],
             )
-        elif opname in [
-            "CRot",
-            "CRot.inv",
-            "C(Rot)",
-            "C(Rot).inv",
-            "C(CRot)",
-            "C(CRot).inv",
-        ]:
+        elif opname in ["CRot", "C(Rot)", "C(CRot)"]:
             phi = par[0]
             theta = par[1]
             omega = par[2]
-            if ".inv" in opname:
+            if is_inv:
                 tmp = phi
                 phi = -omega
                 theta = -theta
@@ -433,143 +416,74 @@ class QrackDevice(QubitDevice):
                 cmath.exp(-0.5j * (phi - omega)) * s,
                 cmath.exp(0.5j * (phi + omega)) * np.cos(theta / 2),
             ]
-            self._state.mcmtrx(device_wires.labels[:-1], mtrx, device_wires.labels[-1])
-        elif opname in ["SWAP", "SWAP.inv"]:
-            self._state.swap(device_wires.labels[0], device_wires.labels[1])
+            state.mcmtrx(device_wires.labels[:-1], mtrx, device_wires.labels[-1])
+        elif opname == "SWAP":
+            state.swap(device_wires.labels[0], device_wires.labels[1])
         elif opname == "ISWAP":
-            self._state.iswap(device_wires.labels[0], device_wires.labels[1])
-        elif opname == "ISWAP.inv":
-            self._state.adjiswap(device_wires.labels[0], device_wires.labels[1])
-        elif opname == "C(ISWAP)":
-            self._state.mcu(device_wires.labels[:-1], device_wires.labels[-1], 0, 0, 1j)
-            self._state.cswap(
-                device_wires.labels[:-2],
-                device_wires.labels[-2],
-                device_wires.labels[-1],
-            )
-            self._state.mcu(device_wires.labels[:-1], device_wires.labels[-1], 0, 0, 1j)
-        elif opname == "C(ISWAP).inv":
-            self._state.mcu(device_wires.labels[:-1], device_wires.labels[-1], 0, 0, -1j)
-            self._state.cswap(
-                device_wires.labels[:-2],
-                device_wires.labels[-2],
-                device_wires.labels[-1],
-            )
-            self._state.mcu(device_wires.labels[:-1], device_wires.labels[-1], 0, 0, -1j)
-        elif opname == "C(PSWAP)":
-            self._state.mcu(device_wires.labels[:-1], device_wires.labels[-1], 0, 0, par[0])
-            self._state.cswap(
-                device_wires.labels[:-2],
-                device_wires.labels[-2],
-                device_wires.labels[-1],
-            )
-            self._state.mcu(device_wires.labels[:-1], device_wires.labels[-1], 0, 0, par[0])
-        elif opname == "C(PSWAP).inv":
-            self._state.mcu(device_wires.labels[:-1], device_wires.labels[-1], 0, 0, -par[0])
-            self._state.cswap(
+            if is_inv:
+                state.adjiswap(device_wires.labels[0], device_wires.labels[1])
+            else:
+                state.iswap(device_wires.labels[0], device_wires.labels[1])
+        elif opname in ["C(ISWAP)", "C(PSWAP)"]:
+            phase = 1j if opname == "C(ISWAP)" else par[0]
+            if is_inv:
+                phase = -phase
+            state.mcu(device_wires.labels[:-1], device_wires.labels[-1], 0, 0, phase)
+            state.cswap(
                 device_wires.labels[:-2],
                 device_wires.labels[-2],
                 device_wires.labels[-1],
             )
-            self._state.mcu(device_wires.labels[:-1], device_wires.labels[-1], 0, 0, -par[0])
-        elif opname in ["CY", "CY.inv", "C(CY)", "C(CY).inv"]:
-            self._state.mcy(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["CZ", "CZ.inv", "C(CZ)", "C(CZ).inv"]:
-            self._state.mcz(device_wires.labels[:-1], device_wires.labels[-1])
+            state.mcu(device_wires.labels[:-1], device_wires.labels[-1], 0, 0, phase)
+        elif opname in ["CY", "C(CY)"]:
+            state.mcy(device_wires.labels[:-1], device_wires.labels[-1])
+        elif opname in ["CZ", "C(CZ)"]:
+            state.mcz(device_wires.labels[:-1], device_wires.labels[-1])
         elif opname == "S":
+            s = state.adjs if is_inv else state.s
             for label in device_wires.labels:
-                self._state.s(label)
-        elif opname == "S.inv":
-            for label in device_wires.labels:
-                self._state.adjs(label)
+                s(label)
         elif opname == "C(S)":
-            self._state.mcs(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname == "C(S).inv":
-            self._state.mcadjs(device_wires.labels[:-1], device_wires.labels[-1])
+            mcs = state.mcadjs if is_inv else state.mcs
+            mcs(device_wires.labels[:-1], device_wires.labels[-1])
         elif opname == "T":
+            t = state.adjt if is_inv else state.t
             for label in device_wires.labels:
-                self._state.t(label)
-        elif opname == "T.inv":
-            for label in device_wires.labels:
-                self._state.adjt(label)
+                t(label)
         elif opname == "C(T)":
-            self._state.mct(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname == "C(T).inv":
-            self._state.mcadjt(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname == "RX":
+            mct = state.mcadjt if is_inv else state.mct
+            mct(device_wires.labels[:-1], device_wires.labels[-1])
+        elif opname in ["RX", "RY", "RZ"]:
+            pauli = _ROTATION_AXES[opname]
+            theta = -par[0] if is_inv else par[0]
             for label in device_wires.labels:
-                self._state.r(Pauli.PauliX, par[0], label)
-        elif opname == "RX.inv":
+                state.r(pauli, theta, label)
+        elif opname == "PauliX":
             for label in device_wires.labels:
-                self._state.r(Pauli.PauliX, -par[0], label)
-        elif opname in ["CRX", "C(RX)", "C(CRX)"]:
-            self._state.mcr(Pauli.PauliX, par[0], device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["CRX.inv", "C(RX).inv", "C(CRX).inv"]:
-            self._state.mcr(Pauli.PauliX, par[0], device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname == "RY":
+                state.x(label)
+        elif opname == "PauliY":
             for label in device_wires.labels:
-                self._state.r(Pauli.PauliY, par[0], label)
-        elif opname == "RY.inv":
+                state.y(label)
+        elif opname == "PauliZ":
             for label in device_wires.labels:
-                self._state.r(Pauli.PauliY, -par[0], label)
-        elif opname in ["CRY", "C(RY)", "C(CRY)"]:
-            self._state.mcr(Pauli.PauliY, par[0], device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["CRY.inv", "C(RY).inv", "C(CRY).inv"]:
-            self._state.mcr(Pauli.PauliY, par[0], device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname == "RZ":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliZ, par[0], label)
-        elif opname == "RZ.inv":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliZ, -par[0], label)
-        elif opname in ["CRZ", "C(RZ)", "C(CRZ)"]:
-            self._state.mcr(Pauli.PauliZ, par[0], device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["CRZ.inv", "C(RZ).inv", "C(CRZ).inv"]:
-            self._state.mcr(Pauli.PauliY, par[0], device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["PauliX", "PauliX.inv"]:
-            for label in device_wires.labels:
-                self._state.x(label)
-        elif opname in ["PauliY", "PauliY.inv"]:
+                state.z(label)
+        elif opname == "Hadamard":
             for label in device_wires.labels:
-                self._state.y(label)
-        elif opname in ["PauliZ", "PauliZ.inv"]:
-            for label in device_wires.labels:
-                self._state.z(label)
-        elif opname in ["Hadamard", "Hadamard.inv"]:
-            for label in device_wires.labels:
-                self._state.h(label)
+                state.h(label)
         elif opname == "SX":
-            sx_mtrx = [(1 + 1j) / 2, (1 - 1j) / 2, (1 - 1j) / 2, (1 + 1j) / 2]
+            sx_mtrx = _ISX_MTRX if is_inv else _SX_MTRX
             for label in device_wires.labels:
-                self._state.mtrx(sx_mtrx, label)
-        elif opname == "SX.inv":
-            isx_mtrx = [(1 - 1j) / 2, (1 + 1j) / 2, (1 + 1j) / 2, (1 - 1j) / 2]
-            for label in device_wires.labels:
-                self._state.mtrx(isx_mtrx, label)
-        elif opname == "C(SX)":
-            self._state.mcmtrx(
-                device_wires.labels[:-1],
-                [(1 + 1j) / 2, (1 - 1j) / 2, (1 - 1j) / 2, (1 + 1j) / 2],
-                device_wires.labels[-1],
-            )
+                state.mtrx(sx_mtrx, label)
+        elif opname == "C(SX)" and not is_inv:
+            state.mcmtrx(device_wires.labels[:-1], _SX_MTRX, device_wires.labels[-1])
         elif opname == "PhaseShift":
-            p_mtrx = [1, 0, 0, cmath.exp(1j * par[0])]
+            p_mtrx = [1, 0, 0, cmath.exp(1j * (-par[0] if is_inv else par[0]))]
             for label in device_wires.labels:
-                self._state.mtrx(p_mtrx, label)
-        elif opname == "PhaseShift.inv":
-            ip_mtrx = [1, 0, 0, cmath.exp(1j * -par[0])]
-            for label in device_wires.labels:
-                self._state.mtrx(ip_mtrx, label)
+                state.mtrx(p_mtrx, label)
         elif opname == "C(PhaseShift)":
-            self._state.mtrx(
-                device_wires.labels[:-1],
-                [1, 0, 0, cmath.exp(1j * par[0])],
-                device_wires.labels[-1],
-            )
-        elif opname == "C(PhaseShift).inv":
-            self._state.mtrx(
+            state.mtrx(
                 device_wires.labels[:-1],
-                [1, 0, 0, cmath.exp(1j * -par[0])],
+                [1, 0, 0, cmath.exp(1j * (-par[0] if is_inv else par[0]))],
                 device_wires.labels[-1],
             )
         elif opname in [
@@ -578,60 +492,35 @@ class QrackDevice(QubitDevice):
             "CPhase",
             "C(CPhase)",
         ]:
-            self._state.mcmtrx(
+            state.mcmtrx(
                 device_wires.labels[:-1],
-                [1, 0, 0, cmath.exp(1j * par[0])],
-                device_wires.labels[-1],
-            )
-        elif opname in [
-            "ControlledPhaseShift.inv",
-            "C(ControlledPhaseShift).inv",
-            "CPhase.inv",
-            "C(CPhase).inv",
-        ]:
-            self._state.mcmtrx(
-                device_wires.labels[:-1],
-                [1, 0, 0, cmath.exp(1j * -par[0])],
+                [1, 0, 0, cmath.exp(1j * (-par[0] if is_inv else par[0]))],
                 device_wires.labels[-1],
             )
         elif opname == "U3":
+            theta, phi, lam = (-par[0], -par[2], -par[1]) if is_inv else par
             for label in device_wires.labels:
-                self._state.u(label, par[0], par[1], par[2])
-        elif opname == "U3.inv":
-            for label in device_wires.labels:
-                self._state.u(label, -par[0], -par[2], -par[1])
+                state.u(label, theta, phi, lam)
         elif opname == "Rot":
+            if is_inv:
+                angles = ((Pauli.PauliZ, -par[2]), (Pauli.PauliY, -par[1]), (Pauli.PauliZ, -par[0]))
+            else:
+                angles = ((Pauli.PauliZ, par[0]), (Pauli.PauliY, par[1]), (Pauli.PauliZ, par[2]))
             for label in device_wires.labels:
-                self._state.r(Pauli.PauliZ, par[0], label)
-                self._state.r(Pauli.PauliY, par[1], label)
-                self._state.r(Pauli.PauliZ, par[2], label)
-        elif opname == "Rot.inv":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliZ, -par[2], label)
-                self._state.r(Pauli.PauliY, -par[1], label)
-                self._state.r(Pauli.PauliZ, -par[0], label)
+                for pauli, theta in angles:
+                    state.r(pauli, theta, label)
         elif opname == "C(U3)":
-            self._state.mcu(
-                device_wires.labels[:-1],
-                device_wires.labels[-1],
-                par[0],
-                par[1],
-                par[2],
-            )
-        elif opname == "C(U3).inv":
-            self._state.mcu(
+            theta, phi, lam = (-par[0], -par[2], -par[1]) if is_inv else par
+            state.mcu(
                 device_wires.labels[:-1],
                 device_wires.labels[-1],
-                -par[0],
-                -par[2],
-                -par[1],
+                theta,
+                phi,
+                lam,
             )
-        elif opname not in [
-            "Identity",
-            "Identity.inv",
-            "C(Identity)",
-            "C(Identity).inv",
-        ]:
+        elif opname not in ["Identity", "C(Identity)"]:
+            if is_inv:
+                opname += ".inv"
             raise DeviceError(f"Operation {opname} is not supported on a {self.short_name} device.")
 
     def _apply_qubit_unitary(self, op):
@@ -657,49 +546,38 @@ class QrackDevice(QubitDevice):
         all_probs = self._abs(self.state) ** 2
         prob = self.marginal_prob(all_probs, wires)
 
-        if (not "QRACK_FPPOW" in os.environ) or (6 > int(os.environ.get("QRACK_FPPOW"))):
-            tot_prob = 0
-            for p in prob:
-                tot_prob = tot_prob + p
-
+        if _dispatch.QRACK_FPPOW < 6:
+            tot_prob = prob.sum()
             if tot_prob != 1.0:
-                for i in range(len(prob)):
-                    prob[i] = prob[i] / tot_prob
+                prob = prob / tot_prob
 
         return prob
 
     def expval(self, observable, **kwargs):
         if self.shots is None:
-            if isinstance(observable.name, list):
-                b = [self._observable_map[obs] for obs in observable.name]
-            elif observable.name == "Prod":
-                b = [self._observable_map[obs.name] for obs in observable.operands]
-            else:
-                b = [self._observable_map[observable.name]]
+            entry = _dispatch.observable_entry(
+                self._observable_cache, self._observable_map, observable
+            )
+            b = entry[1]
 
             if None not in b:
                 q = self.map_wires(observable.wires)
                 return self._state.pauli_expectation(q, b)
 
             # exact expectation value
-            if callable(observable.eigvals):
-                eigvals = self._asarray(observable.eigvals(), dtype=self.R_DTYPE)
-            else:  # older version of pennylane
-                eigvals = self._asarray(observable.eigvals, dtype=self.R_DTYPE)
+            eigvals = entry[2]
+            if eigvals is None:
+                if callable(observable.eigvals):
+                    eigvals = self._asarray(observable.eigvals(), dtype=self.R_DTYPE)
+                else:  # older version of pennylane
+                    eigvals = self._asarray(observable.eigvals, dtype=self.R_DTYPE)
+                entry[2] = eigvals
             prob = self.probability(wires=observable.wires)
             return self._dot(eigvals, prob)
 
         # estimate the ev
         return np.mean(self.sample(observable))
 
-    def _generate_sample(self):
-        rev_sample = self._state.m_all()
-        sample = 0
-        for i in range(self.num_wires):
-            if (rev_sample & (1 << i)) > 0:
-                sample |= 1 << (self.num_wires - (i + 1))
-        return sample
-
     def generate_samples(self):
         if self.shots is None:
             raise QuantumFunctionError(
@@ -708,38 +586,31 @@ class QrackDevice(QubitDevice):
             )
 
         if self.noise != 0:
-            samples = []
-            for _ in range(self.shots):
-                self._state.reset_all()
+            state = self._state
+            samples = _dispatch.sample_buffer(self.shots, self.num_wires)
+            for i in range(self.shots):
+                state.reset_all()
                 self._apply()
-                samples.append(self._generate_sample())
-            self._samples = QubitDevice.states_to_binary(np.array(samples), self.num_wires)
+                samples[i] = state.m_all()
+            self._samples = _dispatch.samples_to_binary(samples, self.num_wires)
             self._circuit = []
 
             return self._samples
 
         if self.shots == 1:
-            self._samples = QubitDevice.states_to_binary(
-                np.array([self._generate_sample()]), self.num_wires
-            )
+            self._samples = _dispatch.samples_to_binary([self._state.m_all()], self.num_wires)
 
             return self._samples
 
-        # QubitDevice.states_to_binary() doesn't work for >64qb. (Fix by Elara, the custom OpenAI GPT)
-        samples = self._state.measure_shots(list(range(self.num_wires - 1, -1, -1)), self.shots)
-        self._samples = np.array(
-            [list(format(b, f"0{self.num_wires}b")) for b in samples], dtype=np.int8
-        )
+        samples = self._state.measure_shots(list(range(self.num_wires)), self.shots)
+        self._samples = _dispatch.samples_to_binary(samples, self.num_wires)
 
         return self._samples
 
     @property
     def state(self):
         # returns the state after all operations are applied
-        self._reverse_state()
-        o = self._state.out_ket()
-        self._reverse_state()
-        return o
+        return self._reverse_wire_order(self._state.out_ket())
 
     def reset(self):
         self._state.reset_all()
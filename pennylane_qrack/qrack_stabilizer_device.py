@@ -14,12 +14,8 @@
 """
 Base device class for PennyLane-Qrack.
 """
-from functools import reduce
-import cmath, math
-import os
-import pathlib
-import sys
-import itertools as it
+import math
+import importlib.resources
 
 import numpy as np
 
@@ -28,27 +24,60 @@ import numpy as np
 
 # This ensures backwards compatibility with older versions of PennyLane.
 try:
-    from pennylane.exceptions import DeviceError, QuantumFunctionError
+    from pennylane.exceptions import QuantumFunctionError
 except (ModuleNotFoundError, ImportError) as import_error:
-    from pennylane import DeviceError, QuantumFunctionError
+    from pennylane import QuantumFunctionError
 
 from pennylane.devices import QubitDevice
-from pennylane.ops import (
-    BasisState,
-    Adjoint,
-)
+from pennylane.ops import Adjoint
 from pennylane.wires import Wires
 
 from pyqrack import QrackStabilizer, Pauli
 
+from . import _dispatch
 from ._version import __version__
 from sys import platform as _platform
 
 # tolerance for numerical errors
 tolerance = 1e-10
 
-
-class QrackStabilizerDevice(QubitDevice):
+# Euler angles for SX and its inverse
+_HALF_PI = math.pi / 2
+_NEG_HALF_PI = -_HALF_PI
+
+# Operations (and their adjoints) that take a circuit out of the Clifford group
+_NON_CLIFFORD_OPS = frozenset(["T", "RZ"])
+
+# Map from operation name to the native qrack handler binders for the
+# operation and its adjoint (None if the adjoint is not supported)
+_GATE_DISPATCH = {
+    "Identity": _dispatch.self_inverse(_dispatch.identity),
+    "C(Identity)": _dispatch.self_inverse(_dispatch.identity),
+    "CNOT": _dispatch.self_inverse(_dispatch.controlled("mcx")),
+    "C(PauliX)": _dispatch.self_inverse(_dispatch.controlled("mcx")),
+    "C(PauliY)": _dispatch.self_inverse(_dispatch.controlled("mcy")),
+    "C(PauliZ)": _dispatch.self_inverse(_dispatch.controlled("mcz")),
+    "SWAP": _dispatch.self_inverse(_dispatch.two_qubit("swap")),
+    "ISWAP": (_dispatch.two_qubit("iswap"), _dispatch.two_qubit("adjiswap")),
+    "CY": _dispatch.self_inverse(_dispatch.controlled("mcy")),
+    "C(CY)": _dispatch.self_inverse(_dispatch.controlled("mcy")),
+    "CZ": _dispatch.self_inverse(_dispatch.controlled("mcz")),
+    "C(CZ)": _dispatch.self_inverse(_dispatch.controlled("mcz")),
+    "S": (_dispatch.each("s"), _dispatch.each("adjs")),
+    "PauliX": _dispatch.self_inverse(_dispatch.each("x")),
+    "PauliY": _dispatch.self_inverse(_dispatch.each("y")),
+    "PauliZ": _dispatch.self_inverse(_dispatch.each("z")),
+    "Hadamard": _dispatch.self_inverse(_dispatch.each("h")),
+    "SX": (
+        _dispatch.u(lambda par: (_HALF_PI, _NEG_HALF_PI, _HALF_PI)),
+        _dispatch.u(lambda par: (_NEG_HALF_PI, _NEG_HALF_PI, _HALF_PI)),
+    ),
+    "T": (_dispatch.each("t"), _dispatch.each("adjt")),
+    "RZ": (_dispatch.rotation(Pauli.PauliZ), _dispatch.rotation(Pauli.PauliZ, inverse=True)),
+}
+
+
+class QrackStabilizerDevice(_dispatch.GateReplayMixin, QubitDevice):
     """Qrack Stabilizer device"""
 
     name = "Qrack stabilizer device"
@@ -103,41 +132,31 @@ class QrackStabilizerDevice(QubitDevice):
         "RZ",
     }
 
-    config_filepath = pathlib.Path(
-        os.path.dirname(sys.modules[__name__].__file__) + "/QrackStabilizerDeviceConfig.toml"
-    )
+    config_filepath = importlib.resources.files(__package__) / "QrackStabilizerDeviceConfig.toml"
+    _gate_dispatch = _GATE_DISPATCH
 
     def __init__(self, wires=0, shots=None, **kwargs):
         super().__init__(wires=wires, shots=shots)
         self.shots = shots
         self._state = QrackStabilizer(self.num_wires)
         self.device_kwargs = {}
-        self._circuit = []
+        self._init_replay()
+        # Pauli bases and eigenvalues of observables, by observable identity
+        self._observable_cache = {}
         self._is_nc = False
-
-    def _reverse_state(self):
-        end = self.num_wires - 1
-        mid = self.num_wires >> 1
-        for i in range(mid):
-            self._state.swap(i, end - i)
+        # Whether `_circuit` has operations not yet applied to `_state`
+        self._pending = False
 
     def apply(self, operations, **kwargs):
         self._circuit = self._circuit + operations
+        self._replay = None
+        self._pending = True
         for op in operations:
-            opname = op.name
             if isinstance(op, Adjoint):
                 op = op.base
-                opname = op.name + ".inv"
-            if opname in ["T", "T.inv", "RZ", "RZ.inv"]:
+            if op.name in _NON_CLIFFORD_OPS:
                 self._is_nc = True
 
-    def _apply(self):
-        for op in self._circuit:
-            if isinstance(op, BasisState):
-                self._apply_basis_state(op)
-            else:
-                self._apply_gate(op)
-
     def _apply_basis_state(self, op):
         """Initialize a basis state"""
         wires = self.map_wires(Wires(op.wires))
@@ -150,96 +169,7 @@ class QrackStabilizerDevice(QubitDevice):
         if n_basis_state != wire_count:
             raise ValueError("BasisState parameter and wires must be of equal length.")
 
-        for i in range(wire_count):
-            index = wires.labels[i]
-            if par[i] != self._state.m(index):
-                self._state.x(index)
-
-    def _apply_gate(self, op):
-        """Apply native qrack gate"""
-
-        opname = op.name
-        if isinstance(op, Adjoint):
-            op = op.base
-            opname = op.name + ".inv"
-
-        par = op.parameters
-
-        # translate op wire labels to consecutive wire labels used by the device
-        device_wires = self.map_wires(
-            (op.control_wires + op.wires) if op.control_wires else op.wires
-        )
-
-        if opname in [
-            "".join(p)
-            for p in it.product(
-                [
-                    "CNOT",
-                    "C(PauliX)",
-                ],
-                ["", ".inv"],
-            )
-        ]:
-            self._state.mcx(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["C(PauliY)", "C(PauliY).inv"]:
-            self._state.mcy(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["C(PauliZ)", "C(PauliZ).inv"]:
-            self._state.mcz(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["SWAP", "SWAP.inv"]:
-            self._state.swap(device_wires.labels[0], device_wires.labels[1])
-        elif opname == "ISWAP":
-            self._state.iswap(device_wires.labels[0], device_wires.labels[1])
-        elif opname == "ISWAP.inv":
-            self._state.adjiswap(device_wires.labels[0], device_wires.labels[1])
-        elif opname in ["CY", "CY.inv", "C(CY)", "C(CY).inv"]:
-            self._state.mcy(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname in ["CZ", "CZ.inv", "C(CZ)", "C(CZ).inv"]:
-            self._state.mcz(device_wires.labels[:-1], device_wires.labels[-1])
-        elif opname == "S":
-            for label in device_wires.labels:
-                self._state.s(label)
-        elif opname == "S.inv":
-            for label in device_wires.labels:
-                self._state.adjs(label)
-        elif opname in ["PauliX", "PauliX.inv"]:
-            for label in device_wires.labels:
-                self._state.x(label)
-        elif opname in ["PauliY", "PauliY.inv"]:
-            for label in device_wires.labels:
-                self._state.y(label)
-        elif opname in ["PauliZ", "PauliZ.inv"]:
-            for label in device_wires.labels:
-                self._state.z(label)
-        elif opname in ["Hadamard", "Hadamard.inv"]:
-            for label in device_wires.labels:
-                self._state.h(label)
-        elif opname == "SX":
-            half_pi = math.pi / 2
-            for label in device_wires.labels:
-                self._state.u(label, half_pi, -half_pi, half.pi)
-        elif opname == "SX.inv":
-            half_pi = math.pi / 2
-            for label in device_wires.labels:
-                self._state.u(label, -half_pi, -half.pi, half_pi)
-        elif opname == "T":
-            for label in device_wires.labels:
-                self._state.t(label)
-        elif opname == "T.inv":
-            for label in device_wires.labels:
-                self._state.adjt(label)
-        elif opname == "RZ":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliZ, par[0], label)
-        elif opname == "RZ.inv":
-            for label in device_wires.labels:
-                self._state.r(Pauli.PauliZ, -par[0], label)
-        elif opname not in [
-            "Identity",
-            "Identity.inv",
-            "C(Identity)",
-            "C(Identity).inv",
-        ]:
-            raise DeviceError(f"Operation {opname} is not supported on a {self.short_name} device.")
+        _dispatch.set_basis_state(self._state, wires.labels, par, self.num_wires)
 
     def analytic_probability(self, wires=None):
         """Return the (marginal) analytic probability of each computational basis state."""
@@ -249,66 +179,68 @@ class QrackStabilizerDevice(QubitDevice):
         all_probs = self._abs(self.state) ** 2
         prob = self.marginal_prob(all_probs, wires)
 
-        if (not "QRACK_FPPOW" in os.environ) or (6 > int(os.environ.get("QRACK_FPPOW"))):
-            tot_prob = 0
-            for p in prob:
-                tot_prob = tot_prob + p
-
+        if _dispatch.QRACK_FPPOW < 6:
+            tot_prob = prob.sum()
             if tot_prob != 1.0:
-                for i in range(len(prob)):
-                    prob[i] = prob[i] / tot_prob
+                prob = prob / tot_prob
 
         return prob
 
     def expval(self, observable, **kwargs):
         if self.shots is None:
-            if isinstance(observable.name, list):
-                b = [self._observable_map[obs] for obs in observable.name]
-            elif observable.name == "Prod":
-                b = [self._observable_map[obs.name] for obs in observable.operands]
-            else:
-                b = [self._observable_map[observable.name]]
+            entry = _dispatch.observable_entry(
+                self._observable_cache, self._observable_map, observable
+            )
+            b = entry[1]
 
             if None not in b:
+                state = self._state
+                if self._pending:
+                    state.reset_all()
+                    self._apply()
+                    self._pending = False
                 # This will trigger Gaussian elimination,
                 # so it only happens once.
-                self._state.try_separate_1qb(0)
-                # It's cheap to clone a stabilizer,
-                # but we don't want to have to transform
-                # back after terminal measurement.
-                state_clone = self._state.clone()
+                state.try_separate_1qb(0)
 
+                # Rotate into the Z basis in place, rather than cloning the tableau;
+                # the rotations are Clifford, so they are undone exactly afterward.
                 q = self.map_wires(observable.wires)
                 for qb, base in zip(q, b):
                     match base:
                         case Pauli.PauliX:
-                            state_clone.h(qb)
+                            state.h(qb)
+                        case Pauli.PauliY:
+                            state.adjs(qb)
+                            state.h(qb)
+                z = [Pauli.PauliI if base == Pauli.PauliI else Pauli.PauliZ for base in b]
+
+                ev = state.pauli_expectation(q, z)
+
+                for qb, base in zip(q, b):
+                    match base:
+                        case Pauli.PauliX:
+                            state.h(qb)
                         case Pauli.PauliY:
-                            state_clone.adjs(qb)
-                            state_clone.h(qb)
-                b = [Pauli.PauliZ] * len(b)
+                            state.h(qb)
+                            state.s(qb)
 
-                return self._state.pauli_expectation(q, b)
+                return ev
 
             # exact expectation value
-            if callable(observable.eigvals):
-                eigvals = self._asarray(observable.eigvals(), dtype=self.R_DTYPE)
-            else:  # older version of pennylane
-                eigvals = self._asarray(observable.eigvals, dtype=self.R_DTYPE)
+            eigvals = entry[2]
+            if eigvals is None:
+                if callable(observable.eigvals):
+                    eigvals = self._asarray(observable.eigvals(), dtype=self.R_DTYPE)
+                else:  # older version of pennylane
+                    eigvals = self._asarray(observable.eigvals, dtype=self.R_DTYPE)
+                entry[2] = eigvals
             prob = self.probability(wires=observable.wires)
             return self._dot(eigvals, prob)
 
         # estimate the ev
         return np.mean(self.sample(observable))
 
-    def _generate_sample(self):
-        rev_sample = self._state.m_all()
-        sample = 0
-        for i in range(self.num_wires):
-            if (rev_sample & (1 << i)) > 0:
-                sample |= 1 << (self.num_wires - (i + 1))
-        return sample
-
     def generate_samples(self):
         if self.shots is None:
             raise QuantumFunctionError(
@@ -319,13 +251,15 @@ class QrackStabilizerDevice(QubitDevice):
             return self._samples
 
         if self._is_nc:
-            samples = []
-            for _ in range(self.shots):
-                self._state.reset_all()
+            state = self._state
+            samples = _dispatch.sample_buffer(self.shots, self.num_wires)
+            for i in range(self.shots):
+                state.reset_all()
                 self._apply()
-                samples.append(self._generate_sample())
-            self._samples = QubitDevice.states_to_binary(np.array(samples), self.num_wires)
+                samples[i] = state.m_all()
+            self._samples = _dispatch.samples_to_binary(samples, self.num_wires)
             self._circuit = []
+            self._replay = None
 
             return self._samples
 
@@ -333,21 +267,18 @@ class QrackStabilizerDevice(QubitDevice):
         self._apply()
 
         if self.shots == 1:
-            self._samples = QubitDevice.states_to_binary(
-                np.array([self._generate_sample()]), self.num_wires
-            )
+            self._samples = _dispatch.samples_to_binary([self._state.m_all()], self.num_wires)
 
             return self._samples
 
-        # QubitDevice.states_to_binary() doesn't work for >64qb. (Fix by Elara, the custom OpenAI GPT)
-        samples = self._state.measure_shots(list(range(self.num_wires - 1, -1, -1)), self.shots)
-        self._samples = np.array(
-            [list(format(b, f"0{self.num_wires}b")) for b in samples], dtype=np.int8
-        )
+        samples = self._state.measure_shots(list(range(self.num_wires)), self.shots)
+        self._samples = _dispatch.samples_to_binary(samples, self.num_wires)
 
         return self._samples
 
     def reset(self):
-        for i in range(self.num_wires):
-            if self._state.m(i):
-                self._state.x(i)
+        self._state.reset_all()
+        self._circuit = []
+        self._replay = None
+        self._is_nc = False
+        self._pending = False
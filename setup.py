@@ -12,68 +12,72 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #!/usr/bin/env python3
+import compileall
 import os
-import re
-import sys
-import subprocess
-from setuptools import setup
-from setuptools.command.build_py import build_py
+import py_compile
+from setuptools import Distribution, setup
+from setuptools.command.build_ext import build_ext
 
+try:
+    from setuptools.command.bdist_wheel import bdist_wheel
+except ImportError:  # setuptools < 70.1
+    try:
+        from wheel.bdist_wheel import bdist_wheel
+    except ImportError:
+        bdist_wheel = None
 
-class Build(build_py):
+
+class BinaryDistribution(Distribution):
+    """Distribution that always runs build_ext, which builds the native dependencies"""
+
+    def has_ext_modules(self):
+        return True
+
+
+class BuildExt(build_ext):
     def run(self):
-        protoc_command = ["make", "build-deps"]
-        if os.name != "nt":
-            if subprocess.call(protoc_command) != 0:
-                sys.exit(-1)
+        import build_deps
+
+        if os.environ.get("PENNYLANE_QRACK_PREBUILT") == "1":
+            # The native libraries were built beforehand (by cibuildwheel's before-all step)
+            pass
+        else:
+            # PENNYLANE_QRACK_FORCE_BUILD=1 rebuilds even if the native build is up to date
+            build_deps.build(force=os.environ.get("PENNYLANE_QRACK_FORCE_BUILD") == "1")
+
+        # build_py has already run, so place the runtime library in the build tree here
+        library = os.path.join("pennylane_qrack", build_deps.library_name())
+        if not self.inplace and os.path.exists(library):
+            self.copy_file(library, os.path.join(self.build_lib, library))
         super().run()
 
 
-with open("./pennylane_qrack/_version.py") as f:
-    (version,) = re.findall('__version__ = "(.*)"', f.read())
+if bdist_wheel is not None:
+
+    class BdistWheel(bdist_wheel):
+        def run(self):
+            # Ship bytecode in the wheel, so installs that skip compilation import it as-is.
+            # Hash-based pycs stay valid even though installers do not preserve source mtimes.
+            self.run_command("build")
+            build_lib = self.get_finalized_command("build").build_lib
+            compileall.compile_dir(
+                os.path.join(build_lib, "pennylane_qrack"),
+                quiet=1,
+                workers=0,
+                invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH,
+            )
+            super().run()
 
-requirements = ["pennylane>=0.39.0", "pyqrack>=2.11.0, <3.0.0", "numpy>=1.16"]
 
+# Project metadata is declared in pyproject.toml; setup.py only wires in the native build
 info = {
-    "name": "pennylane-qrack",
-    "version": version,
-    "maintainer": "vm6502q",
-    "maintainer_email": "stranoj@gmail.com",
-    "url": "http://github.com/vm6502q",
-    "license": "Apache License 2.0",
-    "packages": ["pennylane_qrack"],
-    "cmdclass": {"build_py": Build},
-    "entry_points": {
-        "pennylane.plugins": ["qrack.simulator = pennylane_qrack.qrack_device:QrackDevice", "qrack.ace = pennylane_qrack.qrack_ace_device:QrackAceDevice", "qrack.stabilizer = pennylane_qrack.qrack_stabilizer_device:QrackStabilizerDevice"]
-    },
-    "description": "PennyLane plugin for Qrack.",
-    "long_description": open("README.rst").read(),
-    "long_description_content_type": "text/x-rst",
+    "distclass": BinaryDistribution,
+    "cmdclass": {"build_ext": BuildExt},
     "provides": ["pennylane_qrack"],
-    "install_requires": requirements,
-    "package_data": {"pennylane_qrack": ["QrackDeviceConfig.toml"]},
-    "include_package_data": True,
 }
 
-classifiers = [
-    "Development Status :: 4 - Beta",
-    "Environment :: Console",
-    "Intended Audience :: Science/Research",
-    "License :: OSI Approved :: Apache Software License",
-    "Natural Language :: English",
-    "Operating System :: POSIX",
-    "Operating System :: MacOS :: MacOS X",
-    "Operating System :: POSIX :: Linux",
-    "Operating System :: Microsoft :: Windows",
-    "Programming Language :: Python",
-    # Make sure to specify here the versions of Python supported
-    "Programming Language :: Python :: 3",
-    "Programming Language :: Python :: 3.9",
-    "Programming Language :: Python :: 3.10",
-    "Programming Language :: Python :: 3.11",
-    "Programming Language :: Python :: 3.12",
-    "Programming Language :: Python :: 3 :: Only",
-    "Topic :: Scientific/Engineering :: Quantum Computing",
-]
+if bdist_wheel is not None:
+    info["cmdclass"]["bdist_wheel"] = BdistWheel
 
-setup(classifiers=classifiers, **info)
+if __name__ == "__main__":
+    setup(**info)
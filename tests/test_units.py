@@ -12,11 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests that application of operations works correctly in the plugin devices"""
+import subprocess
+import sys
+
 import pytest
 
 import numpy as np
 import pennylane as qml
+from pennylane_qrack import _dispatch
 from pennylane_qrack.qrack_device import QrackDevice
+from pennylane_qrack.qrack_stabilizer_device import QrackStabilizerDevice
 from pyqrack import QrackSimulator
 
 
@@ -79,3 +84,184 @@ class TestDeviceUnits:
         for i in range(16):
             actual[i] = actual[i] * np.conjugate(actual[i])
         assert np.allclose(actual, expected)
+
+    @pytest.mark.parametrize("shots", [1, 10])
+    def test_generate_samples_wire_order(self, shots):
+        """Test that generated samples list bits in wire order."""
+        dev = QrackDevice(4, shots=shots, isOpenCL=False)
+        state = np.array((1, 1, 0, 1))
+        op = qml.BasisState(state, wires=[0, 1, 2, 3])
+        dev.apply([op])
+
+        samples = dev.generate_samples()
+        assert samples.shape == (shots, 4)
+        assert np.all(samples == state)
+
+    @pytest.mark.parametrize(
+        "make_device",
+        [
+            lambda wires: QrackDevice(wires, shots=3, noise=0.1, isOpenCL=False),
+            lambda wires: QrackStabilizerDevice(wires, shots=3),
+        ],
+        ids=["simulator", "stabilizer"],
+    )
+    def test_generate_samples_replayed_wide(self, make_device, monkeypatch):
+        """Test that replayed samples are unpacked for more than 64 wires."""
+        wires = 70
+        ones = [0, 64, 69]
+
+        class WideState:
+            """Simulator stand-in returning a fixed measurement wider than 64 bits"""
+
+            def reset_all(self):
+                pass
+
+            def m_all(self):
+                return sum(1 << i for i in ones)
+
+        dev = make_device(wires)
+        monkeypatch.setattr(dev, "_state", WideState())
+        # Take the per-shot replay path of the stabilizer device
+        dev._is_nc = True
+
+        samples = dev.generate_samples()
+        expected = np.zeros(wires, dtype=np.int8)
+        expected[ones] = 1
+        assert samples.shape == (3, wires)
+        assert np.all(samples == expected)
+
+    @pytest.mark.parametrize("obs", [qml.PauliZ(wires=0), qml.Hadamard(wires=0)])
+    def test_expval_reuses_observable(self, obs, tol):
+        """Test that a reused observable is evaluated against the current state."""
+        # No diagonalizing gates are applied here, so both observables are measured
+        # against the computational basis probabilities
+        dev = QrackDevice(1, isOpenCL=False)
+
+        assert np.allclose(dev.expval(obs), 1.0, atol=tol)
+
+        dev.apply([qml.PauliX(wires=0)])
+        assert np.allclose(dev.expval(obs), -1.0, atol=tol)
+
+
+class TestStabilizerExpval:
+    """Unit tests for analytic Pauli expectation values on the stabilizer device."""
+
+    @pytest.mark.parametrize(
+        "obs, expected",
+        [
+            (qml.PauliX(0), 1.0),
+            (qml.PauliY(0), 0.0),
+            (qml.PauliY(3), 1.0),
+            (qml.PauliY(1) @ qml.PauliY(2), -1.0),
+            (qml.PauliX(1) @ qml.PauliX(2), 1.0),
+            (qml.PauliX(0) @ qml.Identity(1), 1.0),
+            (qml.PauliZ(1) @ qml.PauliZ(2), 1.0),
+        ],
+    )
+    def test_pauli_expval(self, obs, expected, tol):
+        """Test that X and Y terms are measured in their own basis without changing the state."""
+        dev = QrackStabilizerDevice(4)
+        # |+> on wire 0, a Bell pair on wires 1 and 2, and |+i> on wire 3
+        state = dev._state
+        state.h(0)
+        state.h(1)
+        state.mcx([1], 2)
+        state.h(3)
+        state.s(3)
+        ket = np.array(state.out_ket())
+
+        assert np.allclose(dev.expval(obs), expected, atol=tol)
+        assert np.allclose(abs(np.vdot(ket, state.out_ket())), 1.0, atol=tol)
+
+    @pytest.mark.parametrize(
+        "obs, expected",
+        [
+            (qml.PauliX(0), 1.0),
+            (qml.PauliY(3), 1.0),
+            (qml.PauliY(1) @ qml.PauliY(2), -1.0),
+            (qml.PauliX(1) @ qml.PauliX(2), 1.0),
+        ],
+    )
+    def test_pauli_expval_applied(self, obs, expected, tol):
+        """Test that applied operations are measured, and that measuring leaves the state intact."""
+        dev = QrackStabilizerDevice(4)
+        dev.apply(
+            [
+                qml.Hadamard(wires=0),
+                qml.Hadamard(wires=1),
+                qml.CNOT(wires=[1, 2]),
+                qml.Hadamard(wires=3),
+                qml.S(wires=3),
+            ]
+        )
+
+        assert np.allclose(dev.expval(obs), expected, atol=tol)
+        assert np.allclose(dev.expval(obs), expected, atol=tol)
+
+
+class TestFuseRotations:
+    """Unit tests for merging consecutive same-axis rotations."""
+
+    def test_merges_same_axis(self, tol):
+        """Test that consecutive rotations about one axis on one wire are merged."""
+        res = _dispatch.fuse_rotations([qml.RX(0.1, wires=0), qml.RX(0.2, wires=0)])
+
+        assert len(res) == 1
+        assert isinstance(res[0], qml.RX)
+        assert res[0].wires == qml.wires.Wires(0)
+        assert np.allclose(res[0].parameters[0], 0.3, atol=tol)
+
+    @pytest.mark.parametrize(
+        "ops, angle",
+        [
+            ([qml.RY(0.5, wires=0), qml.adjoint(qml.RY(0.2, wires=0))], 0.3),
+            ([qml.adjoint(qml.RY(0.2, wires=0)), qml.RY(0.5, wires=0)], 0.3),
+            ([qml.adjoint(qml.RY(0.2, wires=0)), qml.adjoint(qml.RY(0.1, wires=0))], -0.3),
+        ],
+    )
+    def test_adjoint_sign(self, ops, angle, tol):
+        """Test that adjoint rotations are merged with their angle negated."""
+        res = _dispatch.fuse_rotations(ops)
+
+        assert len(res) == 1
+        assert isinstance(res[0], qml.RY)
+        assert np.allclose(res[0].parameters[0], angle, atol=tol)
+
+    @pytest.mark.parametrize(
+        "ops",
+        [
+            [qml.RX(0.1, wires=0), qml.RY(0.2, wires=0)],
+            [qml.RZ(0.1, wires=0), qml.RZ(0.2, wires=1)],
+            [qml.RX(0.1, wires=0), qml.CNOT(wires=[1, 0]), qml.RX(0.2, wires=0)],
+            [qml.adjoint(qml.RX(0.1, wires=0)), qml.RZ(0.2, wires=0)],
+        ],
+    )
+    def test_unmerged_ops_are_kept(self, ops):
+        """Test that operations that are not merged are returned unchanged and in order."""
+        res = _dispatch.fuse_rotations(ops)
+
+        assert len(res) == len(ops)
+        assert all(a is b for a, b in zip(res, ops))
+
+    def test_other_wires_do_not_block(self, tol):
+        """Test that operations on other wires do not interrupt a merge."""
+        h = qml.Hadamard(wires=1)
+        res = _dispatch.fuse_rotations([qml.RZ(0.1, wires=0), h, qml.RZ(0.2, wires=0)])
+
+        assert len(res) == 2
+        assert isinstance(res[0], qml.RZ)
+        assert np.allclose(res[0].parameters[0], 0.3, atol=tol)
+        assert res[1] is h
+
+
+class TestPackaging:
+    """Unit tests for the package itself."""
+
+    def test_package_import_is_lightweight(self):
+        """Test that importing the package does not load pyqrack or the device modules."""
+        code = (
+            "import sys, pennylane_qrack; "
+            "assert 'pyqrack' not in sys.modules; "
+            "assert 'pennylane_qrack.qrack_device' not in sys.modules"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)